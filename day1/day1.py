@@ -1,52 +1,87 @@
-def part1():
-    curr_max = float("-inf")
+import heapq
+from typing import Iterator, List, TextIO
+
+# How much of the file to hold in memory at once
+CHUNK_SIZE = 1 << 16
+
+
+def group_sums(f: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[int]:
+    """
+    Yield the calorie total of each elf, reading f in fixed-size chunks.
+
+    Groups are separated by one (or more) blank lines; a trailing group without
+    a blank line after it is still yielded.
+    """
+    acc = 0
+    in_group = False
+    carry = ""
+
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+
+        lines = (carry + chunk).split("\n")
+        # The last piece may be a partial line; finish it with the next chunk
+        carry = lines.pop()
+
+        for line in lines:
+            line = line.strip()
+            if line:
+                acc += int(line)
+                in_group = True
+            elif in_group:
+                yield acc
+                acc = 0
+                in_group = False
+
+    if carry.strip():
+        acc += int(carry)
+        in_group = True
+    if in_group:
+        yield acc
+
+
+def top_k(sums: Iterator[int], k: int) -> List[int]:
+    """
+    Return the k largest values of sums, largest first, using a bounded min-heap.
+    """
+    if k < 0:
+        raise ValueError(f"Can't keep the top {k} values; k must be at least 0")
+    if k == 0:
+        return []
+
+    heap: List[int] = []
+    for s in sums:
+        if len(heap) < k:
+            heapq.heappush(heap, s)
+        elif s > heap[0]:
+            heapq.heapreplace(heap, s)
+    return sorted(heap, reverse=True)
+
+
+def parse(f: TextIO, n: int = 3) -> List[int]:
+    """
+    Reduce the input to the n largest elf totals, largest first; that's all
+    either part needs. The input must hold at least one group.
+    """
+    top = top_k(group_sums(f), n)
+    if n > 0 and not top:
+        raise ValueError("Calorie list has no elves in it")
+    return top
+
+
+def part1(top: List[int]) -> int:
+    return top[0]
+
+
+def part2(top: List[int]) -> int:
+    return sum(top)
 
-    with open("input.txt") as f:
-        lines = f.readlines()
-        calories = "\n".join(lines)
-
-        groups = calories.split("\n\n\n")
-
-        for group in groups:
-            group_calories = group.split("\n")
-
-            acc = 0
-            for calorie in group_calories:
-                if calorie.strip():
-                    acc += int(calorie)
-            curr_max = max(curr_max, acc)
-
-    print(curr_max)
-
-
-def part2():
-    group_sums = []
 
+if __name__ == "__main__":
     with open("input.txt") as f:
-        lines = f.readlines()
-        calories = "\n".join(lines)
+        top = parse(f)
 
-        groups = calories.split("\n\n\n")
-
-        for group in groups:
-            group_calories = group.split("\n")
-
-            acc = 0
-            for calorie in group_calories:
-                if calorie.strip():
-                    acc += int(calorie)
-            group_sums.append(acc)
-
-    group_sums.sort(reverse=True)
-
-    top_n_sum = 0
-    n = 3
-    for i in range(n):
-        top_n_sum += group_sums[i]
-
-    print(top_n_sum)
-
-
-if __name__ == "__main__":
-    part1()
-    part2()
+    print(part1(top))
+    print(part2(top))
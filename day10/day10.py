@@ -1,6 +1,16 @@
+from __future__ import annotations
+import random
+import sys
+import time
+from array import array
 from enum import Enum
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # the pure-Python trace below works without it
+    np = None
 
 CRT_W = 40
 CRT_H = 6
@@ -31,18 +41,6 @@ def str2command(s: str) -> Command:
     raise ValueError(f"String {s} is not a command")
 
 
-def n_cycles(command: Command) -> int:
-    """
-    Map a command to its number of cycles.
-    """
-    match command:
-        case Command.NOOP:
-            return 1
-        case Command.ADDX:
-            return 2
-    raise ValueError(f"Command {command} is not a valid command")
-
-
 def parse_command(values: List[str]) -> Instruction:
     """
     Parse a " "-separate string into an instruction.
@@ -56,7 +54,341 @@ def parse_command(values: List[str]) -> Instruction:
     raise ValueError(f"Command {command} is not a valid command")
 
 
-def part1():
+def compile_trace(ops: array, args: array) -> Union[array, np.ndarray]:
+    """
+    Run the program (as parsed by parse) once, returning the value of X during
+    every cycle: trace[c - 1] is X during cycle c. It's an int32 NumPy array if
+    NumPy is available, else an array("i").
+
+    An addx only changes X after its second cycle, so X is a running sum of the
+    addx deltas, each landing one cycle late.
+    """
+    if np is not None:
+        return compile_trace_np(ops, args)
+
+    addx = Command.ADDX.value
+
+    trace = array("i")
+    x = 1
+    for op, arg in zip(ops, args):
+        if op == addx:
+            trace.append(x)
+            trace.append(x)
+            x += arg
+        else:
+            trace.append(x)
+    return trace
+
+
+def compile_trace_np(ops: array, args: array) -> np.ndarray:
+    """
+    As compile_trace, with the costs and the running sum vectorized; the parsed
+    arrays are viewed in place, with no Python work per instruction.
+    """
+    ops = np.frombuffer(ops, dtype=np.int8)
+    args = np.frombuffer(args, dtype=np.intc)
+
+    costs = np.where(ops == Command.ADDX.value, 2, 1)
+
+    # Each delta takes effect on the cycle after its instruction finishes
+    ends = np.cumsum(costs)
+    deltas = np.zeros(int(ends[-1]) if len(ends) else 0, dtype=np.int32)
+    deltas[ends[:-1]] = args[:-1]
+
+    return (1 + np.cumsum(deltas)).astype(np.int32)
+
+
+def sample_cycles(first: int = 20, every: int = 40, last: int = 220) -> range:
+    """
+    Every `every`th cycle from first to last (inclusive); by default, the cycles
+    the puzzle asks about.
+    """
+    return range(first, last + 1, every)
+
+
+# The cycles to sample the signal strength at
+SAMPLE_CYCLES = sample_cycles()
+
+
+def signal_strength(trace: Union[array, np.ndarray], cycles: Iterable[int]) -> int:
+    """
+    Sum of cycle * X over the sampled cycles; any set of cycles the program
+    runs for can be asked about, without running it again.
+    """
+    if np is not None and isinstance(trace, np.ndarray):
+        cycles = np.fromiter(cycles, dtype=np.int64)
+        if len(cycles) and (cycles.min() < 1 or cycles.max() > len(trace)):
+            raise ValueError(f"Sampled cycles outside 1..{len(trace)}")
+        return int(np.dot(cycles, trace[cycles - 1]))
+
+    total = 0
+    for cycle in cycles:
+        if not 1 <= cycle <= len(trace):
+            raise ValueError(f"Sampled cycle {cycle} outside 1..{len(trace)}")
+        total += cycle * trace[cycle - 1]
+    return total
+
+
+def framebuffer(
+    trace: Union[array, np.ndarray], width: int = CRT_W, height: int = CRT_H
+) -> List[bytes]:
+    """
+    Render the program onto a width x height CRT, returning one frame per
+    width * height cycles (the last one padded with unlit pixels).
+
+    A pixel is lit iff the sprite (X - 1 to X + 1) covers its column while it's
+    drawn. Each frame is packed 8 pixels to a byte, row-major, the first pixel in
+    the high bit of the first byte.
+    """
+    size = width * height
+    n_frames = max(1, -(-len(trace) // size))
+
+    if np is not None and isinstance(trace, np.ndarray):
+        columns = np.arange(len(trace)) % width
+        lit = np.zeros(n_frames * size, dtype=bool)
+        lit[: len(trace)] = np.abs(trace - columns) <= 1
+        return [np.packbits(frame).tobytes() for frame in lit.reshape(n_frames, size)]
+
+    frames = []
+    for start in range(0, n_frames * size, size):
+        frame = bytearray((size + 7) // 8)
+        for pixel, x in enumerate(trace[start : start + size]):
+            if -1 <= x - pixel % width <= 1:
+                frame[pixel >> 3] |= 0x80 >> (pixel & 7)
+        frames.append(bytes(frame))
+    return frames
+
+
+def frame_rows(frame: bytes, width: int = CRT_W, height: int = CRT_H) -> List[str]:
+    """
+    Unpack a frame into printable rows.
+    """
+    rows = []
+    for top in range(0, width * height, width):
+        rows.append(
+            "".join(
+                "#" if frame[pixel >> 3] & (0x80 >> (pixel & 7)) else "."
+                for pixel in range(top, top + width)
+            )
+        )
+    return rows
+
+
+def parse(lines: Iterable[str]) -> Tuple[array, array]:
+    """
+    Parse the program, one instruction per line, into compact arrays: each
+    instruction's Command value (array("b")), and its argument (array("i"), 0
+    for a noop).
+    """
+    ops = array("b")
+    args = array("i")
+    for line in lines:
+        values = line.split()
+        if not values:
+            continue
+
+        command = str2command(values[0])
+        if len(values) != (2 if command == Command.ADDX else 1):
+            raise ValueError(f"Malformed instruction {line.strip()!r}")
+
+        ops.append(command.value)
+        args.append(int(values[1]) if command == Command.ADDX else 0)
+    return ops, args
+
+
+### An extensible instruction set, for programs beyond noop / addx!
+
+# Registers are named a-z; X (the sprite) is register x
+N_REGISTERS = 26
+X = ord("x") - ord("a")
+
+# Operand kinds
+REG = "reg"
+INT = "int"
+
+
+@dataclass(frozen=True)
+class OpSpec:
+    """
+    How to decode and run an instruction.
+    """
+
+    name: str
+    # cycles the instruction takes; registers change only after the last one
+    cycles: int
+    # the kind of each operand, REG or INT
+    operands: Tuple[str, ...]
+    # (registers, a, b, pc) -> next pc; a and b are the decoded operands
+    run: Callable[[List[int], int, int, int], int]
+
+
+def op_noop(regs: List[int], a: int, b: int, pc: int) -> int:
+    return pc + 1
+
+
+def op_addx(regs: List[int], a: int, b: int, pc: int) -> int:
+    regs[X] += a
+    return pc + 1
+
+
+def op_add(regs: List[int], a: int, b: int, pc: int) -> int:
+    regs[a] += b
+    return pc + 1
+
+
+def op_set(regs: List[int], a: int, b: int, pc: int) -> int:
+    regs[a] = b
+    return pc + 1
+
+
+def op_jmp(regs: List[int], a: int, b: int, pc: int) -> int:
+    return pc + a
+
+
+def op_jnz(regs: List[int], a: int, b: int, pc: int) -> int:
+    return pc + b if regs[a] != 0 else pc + 1
+
+
+# The instruction set; an instruction's opcode is its index
+OPS: List[OpSpec] = [
+    OpSpec("noop", 1, (), op_noop),
+    OpSpec("addx", 2, (INT,), op_addx),
+    # add r v: r += v
+    OpSpec("add", 2, (REG, INT), op_add),
+    # set r v: r = v
+    OpSpec("set", 1, (REG, INT), op_set),
+    # jmp off: jump off instructions (relative)
+    OpSpec("jmp", 1, (INT,), op_jmp),
+    # jnz r off: jump off instructions if r isn't 0
+    OpSpec("jnz", 2, (REG, INT), op_jnz),
+]
+OPCODES: Dict[str, int] = {spec.name: opcode for opcode, spec in enumerate(OPS)}
+
+# The cycles each of the original commands takes, looked up once
+COMMAND_CYCLES: Dict[Command, int] = {
+    command: OPS[OPCODES[command.name.lower()]].cycles for command in Command
+}
+
+
+def n_cycles(command: Command) -> int:
+    """
+    Map a command to its number of cycles.
+    """
+    return COMMAND_CYCLES[command]
+
+
+@dataclass
+class Program:
+    """
+    A decoded program: instruction i is OPS[ops[i]] applied to a[i], b[i].
+    """
+
+    ops: array
+    a: array
+    b: array
+
+
+def decode_operand(kind: str, value: str) -> int:
+    if kind == REG:
+        if len(value) != 1 or not "a" <= value <= "z":
+            raise ValueError(f"Register {value} is not a-z")
+        return ord(value) - ord("a")
+    return int(value)
+
+
+def decode(lines: Iterable[str]) -> Program:
+    """
+    Decode a program, one instruction per line, through the OPS table.
+    """
+    program = Program(ops=array("B"), a=array("q"), b=array("q"))
+
+    for line in lines:
+        values = line.split()
+        if not values:
+            continue
+
+        opcode = OPCODES.get(values[0])
+        if opcode is None:
+            raise ValueError(f"String {values[0]} is not a command")
+
+        kinds = OPS[opcode].operands
+        if len(values) - 1 != len(kinds):
+            raise ValueError(f"{values[0]} takes {len(kinds)} operands: {line!r}")
+
+        operands = [decode_operand(k, v) for k, v in zip(kinds, values[1:])]
+        operands += [0] * (2 - len(operands))
+
+        program.ops.append(opcode)
+        program.a.append(operands[0])
+        program.b.append(operands[1])
+
+    return program
+
+
+def run(program: Program, max_cycles: int = 1 << 32) -> array:
+    """
+    Interpret the program, returning X during every cycle as compile_trace does;
+    stops when the program counter leaves the program, or after max_cycles
+    (so looping programs still end).
+
+    Every instruction is dispatched straight through the per-opcode tables, with
+    each instruction's X values written in one go rather than cycle by cycle.
+    """
+    handlers = [spec.run for spec in OPS]
+    costs = [spec.cycles for spec in OPS]
+    ops, a, b = program.ops, program.a, program.b
+    n = len(ops)
+
+    regs = [0] * N_REGISTERS
+    regs[X] = 1
+
+    trace = array("i")
+    pc = 0
+    while 0 <= pc < n and len(trace) < max_cycles:
+        op = ops[pc]
+        trace.extend([regs[X]] * costs[op])
+        pc = handlers[op](regs, a[pc], b[pc], pc)
+
+    del trace[max_cycles:]
+    return trace
+
+
+def random_program(n_instructions: int, seed: int = 0) -> List[str]:
+    """
+    Generate a program of noop / addx, wrapped in a countdown loop.
+    """
+    rng = random.Random(seed)
+    body = [
+        "noop" if rng.random() < 0.3 else f"addx {rng.randint(-5, 5)}"
+        for _ in range(n_instructions)
+    ]
+    # set c 2; <body>; add c -1; jnz c -(body + 1)
+    return ["set c 2", *body, "add c -1", f"jnz c {-(n_instructions + 1)}"]
+
+
+def benchmark(n_instructions: int = 200000) -> None:
+    """
+    Report cycles per second of the interpreter, and of compile_trace on the same
+    program unrolled (it can't loop).
+    """
+    lines = random_program(n_instructions)
+
+    program = decode(lines)
+    start = time.perf_counter()
+    trace = run(program)
+    elapsed = time.perf_counter() - start
+    rate = len(trace) / elapsed
+    print(f"run: {len(trace)} cycles, {rate:,.0f} cycles/s")
+
+    ops, args = parse(lines[1:-2] * 2)
+    start = time.perf_counter()
+    compiled = compile_trace(ops, args)
+    elapsed = time.perf_counter() - start
+    rate = len(compiled) / elapsed
+    print(f"compile_trace: {len(compiled)} cycles, {rate:,.0f} cycles/s")
+
+
+def part1_reference():
     # sum of signal strengths
     soss = 0
 
@@ -114,5 +446,18 @@ def part1():
     print(f"\nsoss={soss}")
 
 
+def part1():
+    with open("input.txt") as f:
+        trace = compile_trace(*parse(f))
+
+    for row in frame_rows(framebuffer(trace)[0]):
+        print(row)
+
+    print(f"\nsoss={signal_strength(trace, SAMPLE_CYCLES)}")
+
+
 if __name__ == "__main__":
-    part1()
+    if "--bench" in sys.argv:
+        benchmark()
+    else:
+        part1()
@@ -1,6 +1,7 @@
+import copy
 from enum import Enum
 from dataclasses import dataclass
-from typing import List, Literal, Tuple
+from typing import List, Literal, TextIO, Tuple
 
 ROUNDS = 20
 
@@ -168,23 +169,32 @@ def process_round2(
     return monkeys, counts
 
 
-def partX(part: int):
+def parse(f: TextIO) -> List[Monkey]:
     """
-    Monkey business.
+    Parse the blank-line separated monkey descriptions.
     """
     monkeys: List[Monkey] = []
 
-    with open("input.txt") as f:
-        lines = f.readlines()
+    lines = f.readlines()
+
+    monkey_str = ""
+    for line in lines:
+        line = line.strip()
+        monkey_str += f"{line}\n"
+        if not line:
+            monkeys.append(parse_monkey(monkey_str))
+            monkey_str = ""
+    monkeys.append(parse_monkey(monkey_str))
+
+    return monkeys
 
-        monkey_str = ""
-        for line in lines:
-            line = line.strip()
-            monkey_str += f"{line}\n"
-            if not line:
-                monkeys.append(parse_monkey(monkey_str))
-                monkey_str = ""
-        monkeys.append(parse_monkey(monkey_str))
+
+def partX(monkeys: List[Monkey], part: int) -> int:
+    """
+    Monkey business.
+    """
+    # Rounds pass items between monkeys; leave the parsed monkeys untouched
+    monkeys = copy.deepcopy(monkeys)
 
     # for monkey in monkeys:
     #     print(monkey)
@@ -204,9 +214,20 @@ def partX(part: int):
     counts.remove(max_count)
     max2_count = max(counts)
 
-    print(max_count * max2_count)
+    return max_count * max2_count
+
+
+def part1(monkeys: List[Monkey]) -> int:
+    return partX(monkeys, part=1)
+
+
+def part2(monkeys: List[Monkey]) -> int:
+    return partX(monkeys, part=2)
 
 
 if __name__ == "__main__":
-    partX(part=1)
-    partX(part=2)
+    with open("input.txt") as f:
+        monkeys = parse(f)
+
+    print(part1(monkeys))
+    print(part2(monkeys))
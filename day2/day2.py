@@ -1,77 +1,94 @@
-def part1():
+from typing import List, TextIO, Tuple
+
+# How much of the guide to scan at once
+CHUNK_SIZE = 1 << 20
+
+OPPONENT = "ABC"
+YOU = "XYZ"
+
+# Score of a round, indexed [opp][you]
+#
+# A = rock (1)
+# B = paper (2)
+# C = scissors (3)
+#
+# part 1: X, Y, Z are the shape you play
+SCORES1 = (
+    (1 + 3, 2 + 6, 3 + 0),
+    (1 + 0, 2 + 3, 3 + 6),
+    (1 + 6, 2 + 0, 3 + 3),
+)
+# part 2: X, Y, Z are the outcome you need (lose, draw, win)
+SCORES2 = (
+    (3 + 0, 1 + 3, 2 + 6),
+    (1 + 0, 2 + 3, 3 + 6),
+    (2 + 0, 3 + 3, 1 + 6),
+)
+
+
+def count_rounds(chunk: str, counts: List[List[int]]) -> None:
     """
-    Compute rock-paper-scissors tournament total score.
+    Add the number of rounds of each kind in chunk to counts, indexed [opp][you].
+
+    The nine str.count scans run in C, so a chunk is tallied without a Python
+    loop over its lines; chunk must end on a line boundary.
+
+    Anything that isn't one "<opp> <you>" per line would be silently skipped by
+    the substring counts, so the tally is checked against the chunk's tokens
+    (two per round) and lines (at most one round each).
     """
+    n_rounds = 0
+    for i, opp in enumerate(OPPONENT):
+        for j, you in enumerate(YOU):
+            n = chunk.count(f"{opp} {you}")
+            counts[i][j] += n
+            n_rounds += n
 
-    score = 0
-    with open("input.txt") as f:
-        lines = f.readlines()
-
-        for line in lines:
-            opp, you = line.strip().split(" ")
-
-            match f"{opp}{you}":
-                case "AX":
-                    score += 1 + 3
-                case "BX":
-                    score += 1 + 0
-                case "CX":
-                    score += 1 + 6
-                case "AY":
-                    score += 2 + 6
-                case "BY":
-                    score += 2 + 3
-                case "CY":
-                    score += 2 + 0
-                case "AZ":
-                    score += 3 + 0
-                case "BZ":
-                    score += 3 + 6
-                case "CZ":
-                    score += 3 + 3
-
-    print(score)
-
-
-def part2():
+    n_tokens = len(chunk.split())
+    n_lines = chunk.count("\n") + (not chunk.endswith("\n"))
+    if n_tokens != 2 * n_rounds or n_rounds > n_lines:
+        raise ValueError(f"Malformed round in strategy guide chunk {chunk[:80]!r}")
+
+
+def parse(f: TextIO, chunk_size: int = CHUNK_SIZE) -> List[List[int]]:
     """
-    Compute rock-paper-scissors tournament total score.
+    Tally the strategy guide into a 3x3 matrix of round counts; both parts are a
+    weighted sum over it.
+    """
+    counts = [[0] * len(YOU) for _ in OPPONENT]
+
+    while True:
+        # Finish the current line so no round straddles two chunks
+        chunk = f.read(chunk_size) + f.readline()
+        if not chunk:
+            break
+        count_rounds(chunk, counts)
+
+    return counts
 
-    A = rock (1)
-    B = paper (2)
-    C = scissors (3)
+
+def score(counts: List[List[int]], scores: Tuple[Tuple[int, ...], ...]) -> int:
+    """
+    Compute rock-paper-scissors tournament total score.
     """
+    total = 0
+    for count_row, score_row in zip(counts, scores):
+        for count, s in zip(count_row, score_row):
+            total += count * s
+    return total
+
+
+def part1(counts: List[List[int]]) -> int:
+    return score(counts, SCORES1)
 
-    score = 0
-    with open("input.txt") as f:
-        lines = f.readlines()
-
-        for line in lines:
-            opp, you = line.strip().split(" ")
-
-            match f"{opp}{you}":
-                case "AX":
-                    score += 3 + 0
-                case "BX":
-                    score += 1 + 0
-                case "CX":
-                    score += 2 + 0
-                case "AY":
-                    score += 1 + 3
-                case "BY":
-                    score += 2 + 3
-                case "CY":
-                    score += 3 + 3
-                case "AZ":
-                    score += 2 + 6
-                case "BZ":
-                    score += 3 + 6
-                case "CZ":
-                    score += 1 + 6
-
-    print(score)
+
+def part2(counts: List[List[int]]) -> int:
+    return score(counts, SCORES2)
 
 
 if __name__ == "__main__":
-    part1()
-    part2()
+    with open("input.txt") as f:
+        counts = parse(f)
+
+    print(part1(counts))
+    print(part2(counts))
@@ -1,13 +1,14 @@
-from typing import List
+from typing import List, TextIO
 
 
 def priority(c: str) -> int:
     """
     Return the priority of a letter. Assumes c is a single-character in [a-zA-Z].
     """
-    if ord(c) >= 65 and ord(c) <= 90:
-        return ord(c) - 38
-    return ord(c) - 96
+    o = ord(c)
+    if o >= 65 and o <= 90:
+        return o - 38
+    return o - 96
 
 
 assert priority("a") == 1
@@ -17,6 +18,27 @@ assert priority("A") == 27
 assert priority("B") == 28
 assert priority("Z") == 52
 
+# Each item gets the bit (priority - 1) of a 52-bit mask
+ITEM_BIT = {
+    c: 1 << (priority(c) - 1)
+    for c in "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+}
+BIT_ITEM = {bit: c for c, bit in ITEM_BIT.items()}
+
+
+def item_mask(s: str) -> int:
+    """
+    Return the mask of the items in s.
+    """
+    mask = 0
+    for c in set(s):
+        mask |= ITEM_BIT[c]
+    return mask
+
+
+assert item_mask("") == 0
+assert item_mask("aZa") == ITEM_BIT["a"] | ITEM_BIT["Z"]
+
 
 def common_letter(a: str, b: str) -> str:
     """
@@ -24,9 +46,10 @@ def common_letter(a: str, b: str) -> str:
     """
     assert len(a) == len(b)
 
-    for c in a:
-        if c in b:
-            return c
+    common = item_mask(a) & item_mask(b)
+    if common:
+        # Isolate the lowest set bit
+        return BIT_ITEM[common & -common]
 
     raise ValueError("strings %s and %s don't have a common string", a, b)
 
@@ -35,9 +58,9 @@ def common_letter2(a: str, b: str, c: str) -> str:
     """
     Find the common letter c between three strings. Assume such a letter exists.
     """
-    for char in a:
-        if char in b and char in c:
-            return char
+    common = item_mask(a) & item_mask(b) & item_mask(c)
+    if common:
+        return BIT_ITEM[common & -common]
 
     raise ValueError("strings %s, %s and %s don't have a common string", a, b, c)
 
@@ -56,33 +79,35 @@ def make_groups(l: List[str]) -> List[str]:
         yield l[i : i + 3]
 
 
-def part1():
-    total = 0
-    with open("input.txt") as f:
-        lines = f.readlines()
+def parse(f: TextIO) -> List[str]:
+    """
+    Parse the input into a list of rucksacks, without their newlines.
+    """
+    return [line.strip() for line in f if line.strip()]
 
-        for line in lines:
-            line = line.strip()
-            n = len(line)
-            if n % 2 != 0:
-                raise ValueError("line length not even %s", line)
 
-            a, b = line[: n // 2], line[n // 2 :]
-            total += priority(common_letter(a, b))
-    print(total)
+def part1(rucksacks: List[str]) -> int:
+    total = 0
+    for line in rucksacks:
+        n = len(line)
+        if n % 2 != 0:
+            raise ValueError("line length not even %s", line)
 
+        a, b = line[: n // 2], line[n // 2 :]
+        total += priority(common_letter(a, b))
+    return total
 
-def part2():
-    total = 0
-    with open("input.txt") as f:
-        lines = f.readlines()
-        groups = make_groups(lines)
 
-        for a, b, c in groups:
-            total += priority(common_letter2(a, b, c))
-    print(total)
+def part2(rucksacks: List[str]) -> int:
+    total = 0
+    for a, b, c in make_groups(rucksacks):
+        total += priority(common_letter2(a, b, c))
+    return total
 
 
 if __name__ == "__main__":
-    part1()
-    part2()
+    with open("input.txt") as f:
+        rucksacks = parse(f)
+
+    print(part1(rucksacks))
+    print(part2(rucksacks))
@@ -1,3 +1,11 @@
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Iterator, List, TextIO, Tuple
+
+# (a_s, a_e, b_s, b_e)
+Pair = Tuple[int, int, int, int]
+
+
 def contains(a_s: int, a_e: int, b_s: int, b_e: int) -> bool:
     """
     For numeric pairs (a_s, a_e) and (b_s, b_e) where
@@ -23,40 +31,172 @@ def overlaps(a_s: int, a_e: int, b_s: int, b_e: int) -> bool:
     return (a_s <= b_s and b_s <= a_e) or (b_s <= a_s and a_s <= b_e)
 
 
-def part1():
-    with open("input.txt") as f:
-        lines = f.readlines()
+def parse(f: TextIO) -> List[Pair]:
+    """
+    Parse each "a_s-a_e,b_s-b_e" line into a tuple of ints.
+    """
+    pairs: List[Pair] = []
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
 
-        count = 0
-        for line in lines:
-            a, b = line.split(",")
+        a, b = line.split(",")
 
-            a_s, a_e = a.split("-")
-            b_s, b_e = b.split("-")
+        a_s, a_e = a.split("-")
+        b_s, b_e = b.split("-")
 
-            a_s, a_e, b_s, b_e = int(a_s), int(a_e), int(b_s), int(b_e)
+        pairs.append((int(a_s), int(a_e), int(b_s), int(b_e)))
+    return pairs
 
-            count = count + contains(a_s, a_e, b_s, b_e)
-        print(count)
 
+@dataclass
+class IntervalIndex:
+    """
+    Every assignment (both elves of every pair) with its endpoints sorted, for
+    range queries over the sections.
+    """
 
-def part2():
-    with open("input.txt") as f:
-        lines = f.readlines()
+    # (start, end, pair index), sorted by start
+    intervals: List[Tuple[int, int, int]]
+    # all starts, sorted (parallel to intervals)
+    starts: List[int]
+    # all ends, sorted independently of starts
+    ends: List[int]
+    # max-segment tree over the ends of intervals (in start order): node k covers
+    # its children 2k and 2k + 1, and leaf i is at len(max_end) // 2 + i
+    max_end: List[int]
 
-        count = 0
-        for line in lines:
-            a, b = line.split(",")
 
-            a_s, a_e = a.split("-")
-            b_s, b_e = b.split("-")
+# Pads the leaves of max_end; below any section
+NO_END = -(1 << 62)
 
-            a_s, a_e, b_s, b_e = int(a_s), int(a_e), int(b_s), int(b_e)
 
-            count = count + overlaps(a_s, a_e, b_s, b_e)
-        print(count)
+def build_index(pairs: List[Pair]) -> IntervalIndex:
+    """
+    Build the index in O(n log n).
+    """
+    intervals: List[Tuple[int, int, int]] = []
+    for i, (a_s, a_e, b_s, b_e) in enumerate(pairs):
+        intervals.append((a_s, a_e, i))
+        intervals.append((b_s, b_e, i))
+    intervals.sort()
+
+    size = 1
+    while size < len(intervals):
+        size *= 2
+    max_end = [NO_END] * (2 * size)
+    for i, (_, end, _) in enumerate(intervals):
+        max_end[size + i] = end
+    for node in range(size - 1, 0, -1):
+        max_end[node] = max(max_end[2 * node], max_end[2 * node + 1])
+
+    return IntervalIndex(
+        intervals=intervals,
+        starts=[start for start, _, _ in intervals],
+        ends=sorted(end for _, end, _ in intervals),
+        max_end=max_end,
+    )
+
+
+def coverage(index: IntervalIndex, section: int) -> int:
+    """
+    Return how many assignments cover section.
+    """
+    # started at or before section, minus those that already ended
+    return bisect_right(index.starts, section) - bisect_left(index.ends, section)
+
+
+def count_overlapping(index: IntervalIndex, a: int, b: int) -> int:
+    """
+    Return how many assignments overlap the range [a, b] at all.
+    """
+    # anything ending before a also starts before b, so never double-subtracted
+    return bisect_right(index.starts, b) - bisect_left(index.ends, a)
+
+
+def pairs_overlapping(index: IntervalIndex, a: int, b: int) -> List[int]:
+    """
+    Return the (sorted) indices of pairs with an assignment overlapping [a, b].
+
+    The candidates are the intervals starting at or before b, a prefix of the
+    start order; descend the max_end tree over that prefix, skipping every
+    subtree whose intervals all end before a. That's O((m + 1) log n) for m
+    matching assignments, rather than a scan of the whole prefix.
+    """
+    n_candidates = bisect_right(index.starts, b)
+    size = len(index.max_end) // 2
+
+    found = set()
+    nodes = [(1, 0, size)]
+    while len(nodes) > 0:
+        node, lo, hi = nodes.pop()
+        if lo >= n_candidates or index.max_end[node] < a:
+            continue
+        if node >= size:
+            found.add(index.intervals[lo][2])
+            continue
+        mid = (lo + hi) // 2
+        nodes.append((2 * node, lo, mid))
+        nodes.append((2 * node + 1, mid, hi))
+    return sorted(found)
+
+
+def sweep(index: IntervalIndex) -> Iterator[Tuple[int, int]]:
+    """
+    Sweep the sections left to right, yielding (section, coverage) wherever the
+    coverage changes.
+    """
+    # Coverage rises at a start, and falls just after an end
+    events = [(start, 1) for start in index.starts]
+    events.extend((end + 1, -1) for end in index.ends)
+    events.sort()
+
+    curr = 0
+    for j, (section, delta) in enumerate(events):
+        curr += delta
+        if j == len(events) - 1 or events[j + 1][0] != section:
+            yield section, curr
+
+
+def coverage_many(index: IntervalIndex, sections: List[int]) -> List[int]:
+    """
+    Bulk version of coverage; answers all sections in one merge over the sorted
+    endpoints rather than a pair of bisects each.
+    """
+    order = sorted(range(len(sections)), key=lambda k: sections[k])
+    counts = [0] * len(sections)
+
+    n = len(index.starts)
+    n_started, n_ended = 0, 0
+    for k in order:
+        section = sections[k]
+        while n_started < n and index.starts[n_started] <= section:
+            n_started += 1
+        while n_ended < n and index.ends[n_ended] < section:
+            n_ended += 1
+        counts[k] = n_started - n_ended
+
+    return counts
+
+
+def part1(pairs: List[Pair]) -> int:
+    count = 0
+    for a_s, a_e, b_s, b_e in pairs:
+        count = count + contains(a_s, a_e, b_s, b_e)
+    return count
+
+
+def part2(pairs: List[Pair]) -> int:
+    count = 0
+    for a_s, a_e, b_s, b_e in pairs:
+        count = count + overlaps(a_s, a_e, b_s, b_e)
+    return count
 
 
 if __name__ == "__main__":
-    part1()
-    part2()
+    with open("input.txt") as f:
+        pairs = parse(f)
+
+    print(part1(pairs))
+    print(part2(pairs))
@@ -1,96 +1,132 @@
-from typing import List
+from typing import Iterable, Iterator, List, TextIO, Tuple
 
-STACK_WIDTH = 9
-STACK_HEIGHT = 8
+# (n, s, e) for "move n from s to e"
+Step = Tuple[int, int, int]
 
 
-def part1():
-    with open("input.txt") as f:
-        # Create stacks to push and pop crates from
-        stacks: List[List[str]] = []
-        for i in range(STACK_WIDTH):
-            stack = []
-            stacks.append(stack)
+def parse_drawing(f: TextIO) -> List[List[str]]:
+    """
+    Read the crate drawing from the top of f, up to and including the blank line
+    after it, and return its stacks (bottom first).
 
-        lines = f.readlines()
+    The drawing's height and the number of stacks are discovered from the
+    numbered baseline (" 1   2   3 ..."), rather than assumed.
+    """
+    rows: List[str] = []
+    for line in f:
+        line = line.rstrip("\n")
+        labels = line.split()
+        if labels and all(label.isdigit() for label in labels):
+            break
+        rows.append(line)
+    else:
+        raise ValueError("Crate drawing has no numbered baseline")
 
-        for line in lines[0:STACK_HEIGHT]:
-            line = line.strip()
-            n = len(line)
+    # Skip the blank line separating the drawing from the moves
+    f.readline()
 
-            for i in range(0, n, 4):
-                crate = line[i : i + 3].strip()
-                if crate:
-                    stacks[i // 4].insert(0, crate[1])
+    stacks: List[List[str]] = [[] for _ in labels]
 
-        for line in lines[STACK_HEIGHT + 2 :]:
-            line = line.strip()
+    # Build each stack bottom-up, so every crate is an append; crate letters
+    # sit in every 4th column, starting at column 1
+    for row in reversed(rows):
+        for i, crate in enumerate(row[1::4]):
+            if crate != " ":
+                stacks[i].append(crate)
 
-            n, from_to = line.split("from")
-            s, e = from_to.split("to")
+    return stacks
 
-            n = n[5:].strip()
-            n = int(n)
 
-            s, e = s.strip(), e.strip()
-            s, e = int(s), int(e)
+def iter_steps(f: TextIO) -> Iterator[Step]:
+    """
+    Lazily parse the remaining lines of f into steps.
+    """
+    for line in f:
+        values = line.split()
+        if not values:
+            continue
 
-            for i in range(n):
-                if len(stacks[s - 1]) > 0:
-                    last = stacks[s - 1].pop()
-                    stacks[e - 1].append(last)
+        # move n from s to e
+        yield int(values[1]), int(values[3]), int(values[5])
 
-        retval = ""
-        for stack in stacks:
-            retval += stack[len(stack) - 1]
-        print(retval)
 
+def parse(f: TextIO) -> Tuple[List[List[str]], List[Step]]:
+    """
+    Parse the crate drawing into stacks (bottom first) and the moves into steps.
+    """
+    stacks = parse_drawing(f)
+    return stacks, list(iter_steps(f))
 
-def part2():
-    with open("input.txt") as f:
-        # Create stacks to push and pop crates from
-        stacks: List[List[str]] = []
-        for i in range(STACK_WIDTH):
-            stack = []
-            stacks.append(stack)
 
-        lines = f.readlines()
+def move(stacks: List[List[str]], step: Step, keep_order: bool) -> None:
+    """
+    Apply a step in place, moving all n crates as one slice.
+
+    The CrateMover 9000 moves crates one at a time, which reverses the slice;
+    the CrateMover 9001 (keep_order) moves them together.
+    """
+    n, s, e = step
+
+    src = stacks[s - 1]
+    split = max(len(src) - n, 0)
+
+    moved = src[split:]
+    del src[split:]
+    if not keep_order:
+        moved.reverse()
+
+    stacks[e - 1].extend(moved)
 
-        for line in lines[0:STACK_HEIGHT]:
-            line = line.strip()
-            n = len(line)
 
-            for i in range(0, n, 4):
-                crate = line[i : i + 3].strip()
-                if crate:
-                    stacks[i // 4].insert(0, crate[1])
+def crane(
+    stacks: List[List[str]], steps: Iterable[Step], keep_order: bool
+) -> List[List[str]]:
+    """
+    Run every step against a copy of the stacks.
+    """
+    stacks = [list(stack) for stack in stacks]
 
-        for line in lines[STACK_HEIGHT + 2 :]:
-            line = line.strip()
+    for step in steps:
+        move(stacks, step, keep_order)
 
-            n, from_to = line.split("from")
-            s, e = from_to.split("to")
+    return stacks
 
-            n = n[5:].strip()
-            n = int(n)
 
-            s, e = s.strip(), e.strip()
-            s, e = int(s), int(e)
+def tops(stacks: List[List[str]]) -> str:
+    """
+    The crate on top of each stack. Every stack must have one: skipping an empty
+    stack would shift the letters after it to the wrong positions.
+    """
+    for i, stack in enumerate(stacks):
+        if not stack:
+            raise ValueError(f"Stack {i + 1} is empty; no crate on top")
+    return "".join(stack[-1] for stack in stacks)
 
-            for i in range(n):
-                if len(stacks[s - 1]) > 0:
-                    last = stacks[s - 1].pop()
 
-                    # New bit: insert in the middle of the list each time
-                    e_len = len(stacks[e - 1])
-                    stacks[e - 1].insert(e_len - i, last)
+def part1(data: Tuple[List[List[str]], List[Step]]) -> str:
+    return tops(crane(data[0], data[1], keep_order=False))
+
+
+def part2(data: Tuple[List[List[str]], List[Step]]) -> str:
+    return tops(crane(data[0], data[1], keep_order=True))
+
+
+def partX() -> None:
+    """
+    Stream the moves through both cranes at once, never holding them all.
+    """
+    with open("input.txt") as f:
+        stacks = parse_drawing(f)
+
+        stacks9000 = [list(stack) for stack in stacks]
+        stacks9001 = stacks
+        for step in iter_steps(f):
+            move(stacks9000, step, keep_order=False)
+            move(stacks9001, step, keep_order=True)
 
-        retval = ""
-        for stack in stacks:
-            retval += stack[len(stack) - 1]
-        print(retval)
+    print(tops(stacks9000))
+    print(tops(stacks9001))
 
 
 if __name__ == "__main__":
-    part1()
-    part2()
+    partX()
@@ -1,18 +1,159 @@
+import io
+import mmap
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import BinaryIO, Dict, List, Optional, Sequence, Union
+
+# How much of the signal to hold in memory at once
+CHUNK_SIZE = 1 << 20
+
+
+def find_markers(
+    f: BinaryIO,
+    sizes: Sequence[int],
+    first_only: bool = True,
+    chunk_size: int = CHUNK_SIZE,
+) -> Dict[int, List[int]]:
+    """
+    Scan the signal in f once, and for each window size in sizes return the
+    offsets (the number of characters read so far) at which the last size
+    characters are all different. With first_only, stop at each size's first
+    marker, i.e., the start-of-packet / start-of-message answer.
+
+    Rather than a set per window, track the length of the longest run of
+    distinct characters ending at the current one, using the index each byte was
+    last seen at; a window of size k is a marker iff that run is at least k. This
+    is O(1) per character no matter the window sizes. The signal ends at the
+    first newline.
+    """
+    markers: Dict[int, List[int]] = {size: [] for size in sizes}
+    pending = sorted(markers)
+
+    last_seen = [-1] * 256
+    run = 0
+    pos = 0
+
+    while pending:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+
+        end = chunk.find(b"\n")
+        if end != -1:
+            chunk = chunk[:end]
+
+        for c in chunk:
+            run = min(run + 1, pos - last_seen[c])
+            last_seen[c] = pos
+            pos += 1
+
+            if run >= pending[0]:
+                for size in pending:
+                    if run < size:
+                        break
+                    markers[size].append(pos)
+                if first_only:
+                    pending = [size for size in pending if not markers[size]]
+                    if not pending:
+                        break
+
+        if end != -1:
+            break
+
+    return markers
+
+
+@dataclass
+class ScanResult:
+    """
+    The first markers found in one stream, and how fast it was scanned.
+    """
+
+    # the path, or "<buffer i>" for the ith in-memory buffer
+    source: str
+    # window size -> first marker offset, None if the stream has none
+    markers: Dict[int, Optional[int]]
+    # bytes read from the stream to find them
+    n_bytes: int
+    seconds: float
+
+    @property
+    def throughput(self) -> float:
+        """
+        Scan speed in MB/s.
+        """
+        return self.n_bytes / 1e6 / self.seconds if self.seconds else float("inf")
+
+
+def scan_source(
+    source: Union[str, bytes], name: str, sizes: Sequence[int]
+) -> ScanResult:
+    """
+    Find the first markers of each size in a file (memory-mapped) or buffer.
+    """
+    start = time.perf_counter()
+
+    if isinstance(source, bytes):
+        f = io.BytesIO(source)
+        markers = find_markers(f, sizes)
+        n_bytes = f.tell()
+    else:
+        with open(source, "rb") as raw:
+            if raw.seek(0, io.SEEK_END) == 0:
+                # mmap refuses empty files
+                markers, n_bytes = find_markers(io.BytesIO(b""), sizes), 0
+            else:
+                with mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ) as f:
+                    markers = find_markers(f, sizes)
+                    n_bytes = f.tell()
+
+    return ScanResult(
+        source=name,
+        markers={size: found[0] if found else None for size, found in markers.items()},
+        n_bytes=n_bytes,
+        seconds=time.perf_counter() - start,
+    )
+
+
+def scan_many(
+    sources: Sequence[Union[str, bytes]],
+    sizes: Sequence[int] = (4, 14),
+    workers: Optional[int] = None,
+) -> List[ScanResult]:
+    """
+    Scan many files or byte buffers concurrently in a process pool, returning a
+    result per source, in order.
+    """
+    names = [
+        f"<buffer {i}>" if isinstance(source, bytes) else source
+        for i, source in enumerate(sources)
+    ]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(partial(scan_source, sizes=sizes), sources, names))
+
+
 def partN(seq_n: int) -> None:
     """
     Print the Nth character in the string that completes a seq_n length sequence
     of non-repeating characters.
     """
-    with open("input.txt") as f:
-        line = f.readlines()[0]
+    with open("input.txt", "rb") as f:
+        print(find_markers(f, [seq_n])[seq_n][0])
+
+
+def partX() -> None:
+    """
+    Find both markers in a single pass over the signal.
+    """
+    with open("input.txt", "rb") as f:
+        markers = find_markers(f, [4, 14])
 
-        n = len(line)
-        for i in range(0, n - seq_n):
-            if len(set(line[i : i + seq_n])) == seq_n:
-                print(i + seq_n)
-                return  # no point in finding additional examples!
+    print(markers[4][0])
+    print(markers[14][0])
 
 
 if __name__ == "__main__":
-    partN(4)
-    partN(14)
+    partX()
@@ -1,5 +1,11 @@
 from __future__ import annotations
-from typing import List, Optional
+import sys
+import time
+import tracemalloc
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
@@ -16,13 +22,14 @@ NEEDED_SPACE = 30000000
 
 # we would expect...
 
-# Node("/", True, 300, [<ref 'i'>, <ref <'a'>])
-# Node("/i", False, 100, [])
-# Node("/a", True, 200, [<ref 'j'>])
-# Node("/a/j", False, 200, [])
+# Node("/", True, 300, {"i": <ref 'i'>, "a": <ref 'a'>})
+# Node("/i", False, 100, None)
+# Node("/a", True, 200, {"j": <ref 'j'>})
+# Node("/a/j", False, 200, None)
 
 
-@dataclass
+# slots: no per-instance __dict__, which adds up over millions of nodes
+@dataclass(slots=True)
 class Node:
     # the path to this node from the root; mostly for debugging help
     path: str
@@ -31,13 +38,13 @@ class Node:
     # true iff this is a directory
     dirent: bool
     # stores its own size;
-    #   - if dir, size of all children / subdirs plus its files (-1 if unknown)
+    #   - if dir, size of all children / subdirs plus its files (seen so far)
     #   - if file, file size
     size: int
     # this node's parent; optional for root only
     parent: Node
-    # the files and folders in this node
-    entries: List[Node]
+    # the files and folders in this node, by name; None for files
+    entries: Optional[Dict[str, Node]]
 
 
 ### Data types to assist with parsing!
@@ -55,13 +62,6 @@ class LsOutput:
     name: str
 
 
-@dataclass
-class Input:
-    cmd: Command
-    args: Optional[str]
-    output: Optional[List[LsOutput]]
-
-
 def parse_command(raw_command: str) -> Command:
     """
     Convert a string to an enum
@@ -85,73 +85,99 @@ def parse_ls_output(raw_ls_output: str) -> LsOutput:
     return LsOutput(dirent=False, size=int(dir_or_size), name=name)
 
 
-def parse_input(raw_input: str) -> Input:
+def build_path(old_path: str, name: str, dirent: bool) -> str:
     """
-    Parse `Command` command from the command str; create input.
+    String formatter helper for paths.
     """
-    lines = raw_input.split("\n")
-    first_line = lines[0].strip()
+    return f"{old_path}/{name}"
+
 
-    values = first_line.split(" ")
-    cmd = parse_command(values[0])
+def add_entry(curr_node: Node, ls_output: LsOutput, incremental: bool = True) -> None:
+    """
+    Add a listed file or folder to curr_node, unless it's already there.
 
-    args = None
-    if cmd == Command.CD:
-        args = values[1]
+    If incremental, a new file's size is added to every directory above it, so
+    sizes are always current; otherwise, call compute_size once at the end.
+    """
+    # Listing the same directory twice must not count it twice
+    if ls_output.name in curr_node.entries:
+        return
 
-    output = None
-    if cmd != Command.CD:
-        # Remove the final blank line
-        output_lines = lines[1 : len(lines) - 1]
-        output = []
-        for line in output_lines:
-            output.append(parse_ls_output(line))
+    path = build_path(curr_node.path, ls_output.name, ls_output.dirent)
+    curr_node.entries[ls_output.name] = Node(
+        path=path,
+        name=ls_output.name,
+        dirent=ls_output.dirent,
+        size=0 if ls_output.dirent else ls_output.size,
+        parent=curr_node,
+        entries={} if ls_output.dirent else None,
+    )
 
-    return Input(cmd=cmd, args=args, output=output)
+    if incremental and not ls_output.dirent:
+        node = curr_node
+        while node is not None:
+            node.size += ls_output.size
+            node = node.parent
 
 
-def build_path(old_path: str, name: str, dirent: bool) -> str:
+def change_dir(curr_node: Node, name: str) -> Node:
     """
-    String formatter helper for paths.
+    Return the node `cd name` moves to from curr_node.
     """
-    return f"{old_path}/{name}"
+    if name == "..":
+        return curr_node.parent
+
+    if name == "/":
+        while curr_node.parent is not None:
+            curr_node = curr_node.parent
+        return curr_node
 
+    entry = curr_node.entries.get(name)
+    if entry is not None:
+        return entry
+    raise ValueError(f"Node with name {name} unknown by {curr_node}")
 
-def process_command(command: Input, curr_node: Node) -> Node:
+
+def process_line(line: str, curr_node: Node, incremental: bool = True) -> Node:
     """
-    Process the command, returning an updated value for curr_node.
+    Apply one line of the transcript to the tree, returning an updated value for
+    curr_node.
+
+    The only state needed between lines is curr_node: `ls` output always lists
+    the directory we're in, so `$ ls` itself is a no-op.
     """
-    match command.cmd:
-        case Command.LS:
-            nodes = []
+    values = line.split()
+    if not values:
+        return curr_node
 
-            for ls_output in command.output:
-                # TODO: check if path already exists in curr_node.entries?
-                path = build_path(curr_node.path, ls_output.name, ls_output.dirent)
-                new_node = Node(
-                    path=path,
-                    name=ls_output.name,
-                    dirent=ls_output.dirent,
-                    size=-1 if ls_output.dirent else ls_output.size,
-                    parent=curr_node,
-                    entries=[] if ls_output.dirent else None,
-                )
-                nodes.append(new_node)
+    if values[0] == "$":
+        match parse_command(values[1]):
+            case Command.CD:
+                return change_dir(curr_node, values[2])
+            case Command.LS:
+                return curr_node
 
-            curr_node.entries.extend(nodes)
+    add_entry(curr_node, parse_ls_output(" ".join(values)), incremental)
+    return curr_node
 
-            return curr_node
 
-        case Command.CD:
-            if command.args == "..":
-                return curr_node.parent
+def build_tree(lines: Iterable[str], incremental: bool = True) -> Node:
+    """
+    Apply the transcript lines as they arrive, e.g., from a file or a generator
+    tailing a live log, and return the root.
 
-            for entry in curr_node.entries:
-                if command.args == entry.name:
-                    return entry
-            raise ValueError(f"Node with name {command.args} unknown by {curr_node}")
+    With incremental=False, directory sizes are left at 0 and compute_size must
+    be run once the build is done; that skips walking up to the root for every
+    file, which is cheaper for a deep tree built in bulk.
+    """
+    # Path set to "" for correct indentation (everything above root)
+    root_node = Node(path="", name="/", dirent=True, size=0, parent=None, entries={})
+
+    curr_node = root_node
+    for line in lines:
+        curr_node = process_line(line, curr_node, incremental)
 
-    raise ValueError(f"Command {command.cmd} not found")
+    return root_node
 
 
 def print_node_in_tree(node: Node, dir_size: bool) -> None:
@@ -179,20 +205,30 @@ def print_tree(root_node: Node, dir_size: bool) -> None:
         curr_node = nodes.pop()
         print_node_in_tree(curr_node, dir_size)
         if curr_node.entries:
-            nodes.extend(curr_node.entries)
+            nodes.extend(curr_node.entries.values())
 
 
-def compute_size(node: Node) -> None:
-    if node.size != -1:
-        return
+def compute_size(root_node: Node) -> None:
+    """
+    Recompute the size of every directory from its files, bottom-up.
 
-    for entry in node.entries:
-        compute_size(entry)
+    Iterative, so deep trees don't hit the recursion limit: children always come
+    after their parent in a pre-order walk, so the reverse of one is a post-order.
+    """
+    dirs = []
 
-    total = 0
-    for entry in node.entries:
-        total += entry.size
-    node.size = total
+    nodes = [root_node]
+    while len(nodes) > 0:
+        curr_node = nodes.pop()
+        if curr_node.dirent:
+            dirs.append(curr_node)
+            nodes.extend(curr_node.entries.values())
+
+    for curr_node in reversed(dirs):
+        total = 0
+        for entry in curr_node.entries.values():
+            total += entry.size
+        curr_node.size = total
 
 
 def sum_of_dirs_threshold(root_node: Node, threshold: int) -> int:
@@ -206,7 +242,7 @@ def sum_of_dirs_threshold(root_node: Node, threshold: int) -> int:
             total += curr_node.size
 
         if curr_node.entries:
-            nodes.extend(curr_node.entries)
+            nodes.extend(curr_node.entries.values())
 
     return total
 
@@ -238,44 +274,297 @@ def size_of_dir_nearest(root_node: Node) -> int:
             size = curr_node.size
 
         if curr_node.entries:
-            nodes.extend(curr_node.entries)
+            nodes.extend(curr_node.entries.values())
 
     return size
 
 
-def partX():
-    with open("input.txt") as f:
-        lines = f.readlines()
-        lines_str = "".join(lines)
+@dataclass
+class SizeIndex:
+    """
+    Every directory's size in sorted order, for answering many threshold /
+    nearest-size queries against the same (sized) tree.
+    """
+
+    # the size of every directory, ascending
+    sizes: List[int]
+    # prefix[i] is the sum of sizes[:i]
+    prefix: List[int]
+
+
+def build_size_index(root_node: Node) -> SizeIndex:
+    """
+    Walk the tree once; sizes must already be current.
+    """
+    sizes = []
+
+    nodes = [root_node]
+    while len(nodes) > 0:
+        curr_node = nodes.pop()
+        if curr_node.dirent:
+            sizes.append(curr_node.size)
+            nodes.extend(curr_node.entries.values())
+
+    sizes.sort()
+    return SizeIndex(sizes=sizes, prefix=list(accumulate(sizes, initial=0)))
+
+
+def sum_of_dirs_threshold_indexed(index: SizeIndex, threshold: int) -> int:
+    """
+    As sum_of_dirs_threshold, in O(log n).
+    """
+    return index.prefix[bisect_right(index.sizes, threshold)]
+
+
+def size_of_dir_nearest_indexed(index: SizeIndex, target: Optional[int] = None) -> int:
+    """
+    As size_of_dir_nearest, in O(log n). The target defaults to what's needed
+    to free up NEEDED_SPACE; the root is always the largest directory.
+    """
+    if target is None:
+        target = NEEDED_SPACE - (DISK_SPACE - index.sizes[-1])
+
+    i = bisect_left(index.sizes, target)
+    return index.sizes[i] if i < len(index.sizes) else float("inf")
+
+
+### A compact, columnar alternative to the Node graph!
+
+# Entry i of the tree is described by the ith element of each array, e.g., for
+# the example tree above we would expect...
+
+# parent = [-1, 0, 0, 2]
+# size   = [300, 100, 200, 200]
+# dirent = [1, 0, 1, 0]
+# name   = ["/", "i", "a", "j"]
+
+
+@dataclass(slots=True)
+class FlatTree:
+    # index of each entry's parent; -1 for root (always entry 0)
+    parent: array
+    # as Node.size
+    size: array
+    # 1 iff the entry is a directory
+    dirent: bytearray
+    # interned, so repeated names are stored once
+    name: List[str]
+    # (parent index, name) -> index, for cd and deduping ls
+    index: Dict[Tuple[int, str], int]
+
 
-        commands: List[Command] = []
-        commands_str = lines_str.split("$")
+def flat_add_entry(
+    tree: FlatTree, curr: int, ls_output: LsOutput, incremental: bool = True
+) -> None:
+    """
+    As add_entry, for a FlatTree.
+    """
+    key = (curr, sys.intern(ls_output.name))
+    if key in tree.index:
+        return
+
+    size = 0 if ls_output.dirent else ls_output.size
+
+    tree.index[key] = len(tree.name)
+    tree.parent.append(curr)
+    tree.size.append(size)
+    tree.dirent.append(ls_output.dirent)
+    tree.name.append(key[1])
+
+    if incremental and size:
+        node = curr
+        while node != -1:
+            tree.size[node] += size
+            node = tree.parent[node]
+
+
+def flat_process_line(
+    line: str, tree: FlatTree, curr: int, incremental: bool = True
+) -> int:
+    """
+    As process_line, for a FlatTree; returns the index of the current directory.
+    """
+    values = line.split()
+    if not values:
+        return curr
+
+    if values[0] == "$":
+        match parse_command(values[1]):
+            case Command.CD:
+                name = values[2]
+                if name == "..":
+                    return tree.parent[curr]
+                if name == "/":
+                    return 0
+
+                entry = tree.index.get((curr, name))
+                if entry is not None:
+                    return entry
+                raise ValueError(f"Node with name {name} unknown by {tree.name[curr]}")
+            case Command.LS:
+                return curr
+
+    flat_add_entry(tree, curr, parse_ls_output(" ".join(values)), incremental)
+    return curr
 
-        for command in commands_str:
-            if command:
-                commands.append(parse_input(command))
 
-        # Path set to "" for correct indentation (everything above root)
-        root_node = Node(
-            path="", name="/", dirent=True, size=-1, parent=None, entries=[]
+def build_flat_tree(lines: Iterable[str], incremental: bool = True) -> FlatTree:
+    """
+    As build_tree, building a FlatTree directly.
+    """
+    tree = FlatTree(
+        parent=array("q", [-1]),
+        size=array("q", [0]),
+        dirent=bytearray([1]),
+        name=["/"],
+        index={},
+    )
+
+    curr = 0
+    for line in lines:
+        curr = flat_process_line(line, tree, curr, incremental)
+
+    return tree
+
+
+def flat_compute_size(tree: FlatTree) -> None:
+    """
+    As compute_size, for a FlatTree. Children are always added after their
+    parent, so a single backwards pass pushes each size up into its parent.
+    """
+    for i in range(len(tree.name)):
+        if tree.dirent[i]:
+            tree.size[i] = 0
+
+    for i in range(len(tree.name) - 1, 0, -1):
+        tree.size[tree.parent[i]] += tree.size[i]
+
+
+def flat_print_tree(tree: FlatTree, dir_size: bool) -> None:
+    """
+    As print_tree, for a FlatTree; prints entries in the same order.
+    """
+    n = len(tree.name)
+
+    # Entries are added in listing order, so this keeps each directory's order
+    children: List[List[int]] = [[] for _ in range(n)]
+    for i in range(1, n):
+        children[tree.parent[i]].append(i)
+
+    nodes = [(0, 0)]
+    while len(nodes) > 0:
+        curr, depth = nodes.pop()
+
+        size = tree.size[curr]
+        details = (
+            (f"dir, size={size}" if dir_size else "dir")
+            if tree.dirent[curr]
+            else f"file, size={size}"
         )
+        print(f"{'  ' * depth}- {tree.name[curr]} ({details})")
 
-        curr_node = root_node
-        for command in commands[1:]:
-            curr_node = process_command(command, curr_node)
+        nodes.extend((child, depth + 1) for child in children[curr])
 
-        # print_tree(root_node=root_node, dir_size=False)
 
-        compute_size(root_node)
+def flat_sum_of_dirs_threshold(tree: FlatTree, threshold: int) -> int:
+    """
+    As sum_of_dirs_threshold, for a FlatTree; no walk needed, just a scan.
+    """
+    total = 0
+    for dirent, size in zip(tree.dirent, tree.size):
+        if dirent and size <= threshold:
+            total += size
+    return total
+
+
+def flat_size_of_dir_nearest(tree: FlatTree) -> int:
+    """
+    As size_of_dir_nearest, for a FlatTree.
+    """
+    target = NEEDED_SPACE - (DISK_SPACE - tree.size[0])
+
+    size = float("inf")
+    for dirent, curr_size in zip(tree.dirent, tree.size):
+        if dirent and target <= curr_size < size:
+            size = curr_size
+    return size
+
+
+def synthetic_transcript(n_dirs: int, files_per_dir: int = 4) -> List[str]:
+    """
+    Generate a transcript of a tree with n_dirs directories, each holding
+    files_per_dir files and (up to) two subdirectories.
+    """
+    lines = ["$ cd /"]
+
+    # Walk the (implicit, binary) tree of directories depth-first
+    def visit(d: int) -> None:
+        lines.append("$ ls")
+        for k in range(files_per_dir):
+            lines.append(f"{1000 + 7 * d + k} f{k}.txt")
+        kids = [c for c in (2 * d + 1, 2 * d + 2) if c < n_dirs]
+        for c in kids:
+            lines.append(f"dir d{c}")
+        for c in kids:
+            lines.append(f"$ cd d{c}")
+            visit(c)
+            lines.append("$ cd ..")
+
+    visit(0)
+    return lines
+
+
+def measure(build: Callable[[], object]) -> Tuple[float, int]:
+    """
+    Return the time (s) and peak traced memory (bytes) of build().
+
+    Tracing slows allocation down a lot, so the two are measured in separate runs.
+    """
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def benchmark(n_dirs: int = 20000) -> None:
+    """
+    Compare build time and memory of the Node graph and the FlatTree.
+    """
+    lines = synthetic_transcript(n_dirs)
+
+    for label, build in [
+        ("node", lambda: build_tree(lines)),
+        ("flat", lambda: build_flat_tree(lines)),
+    ]:
+        elapsed, peak = measure(build)
+        print(f"{label}: {elapsed:.3f} s, {peak / 1e6:.1f} MB")
+
+
+def partX():
+    with open("input.txt") as f:
+        root_node = build_tree(f)
+
+        # Sizes are kept current as the tree is built; no compute_size needed
 
         print_tree(root_node=root_node, dir_size=True)
 
+        index = build_size_index(root_node)
+
         # part1
-        print(sum_of_dirs_threshold(root_node=root_node, threshold=100000))
+        print(sum_of_dirs_threshold_indexed(index=index, threshold=100000))
 
         # part 2
-        print(size_of_dir_nearest(root_node=root_node))
+        print(size_of_dir_nearest_indexed(index=index))
 
 
 if __name__ == "__main__":
-    partX()
+    if "--bench" in sys.argv:
+        benchmark()
+    else:
+        partX()
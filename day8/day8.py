@@ -1,5 +1,95 @@
 from __future__ import annotations
-from typing import List
+import mmap
+import os
+import tempfile
+from array import array
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+try:
+    import numpy as np
+except ImportError:  # the pure-Python sweeps below work without it
+    np = None
+
+# Trees are single digits; nothing can be seen past a 9
+MAX_HEIGHT = 9
+
+# Maps the ASCII digits to their values, for bytes.translate
+DIGITS = bytes.maketrans(b"0123456789", bytes(range(10)))
+
+
+@dataclass
+class ByteGrid:
+    """
+    The forest as one contiguous buffer, laid out exactly as the file is (rows
+    plus their line endings); grid[row] is a zero-copy view of a row.
+
+    If loaded with use_mmap, the cells are the raw ASCII digits ('0' is 48):
+    the engines only ever compare heights, so they give the same answers.
+    """
+
+    data: Union[bytes, mmap.mmap]
+    width: int
+    height: int
+    # bytes from the start of one row to the next
+    stride: int
+
+    def __len__(self) -> int:
+        return self.height
+
+    def __getitem__(self, row: int) -> memoryview:
+        if not 0 <= row < self.height:
+            raise IndexError(f"Row {row} outside grid of height {self.height}")
+        start = row * self.stride
+        return memoryview(self.data)[start : start + self.width]
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        # A strided view over the buffer that skips the line endings
+        grid = np.ndarray(
+            shape=(self.height, self.width),
+            dtype=np.uint8,
+            buffer=self.data,
+            strides=(self.stride, 1),
+        )
+        return grid if dtype is None else grid.astype(dtype)
+
+
+def load_grid(path: str, use_mmap: bool = False) -> ByteGrid:
+    """
+    Load a digit grid into a ByteGrid, either reading it and converting every
+    digit to its value in one bulk translate, or memory-mapping it as is.
+    """
+    with open(path, "rb") as f:
+        if use_mmap:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = f.read().translate(DIGITS)
+
+    width = data.find(b"\n")
+    if width == -1:
+        width = len(data)
+
+    stride = width + 1
+    if width > 0 and data[width - 1 : width] == b"\r":
+        width, stride = width - 1, width + 1
+
+    # The final line ending is optional
+    height = (len(data) + stride - width) // stride
+
+    return ByteGrid(data=data, width=width, height=height, stride=stride)
 
 
 def build_grid(width: int, height: int) -> List[List[int]]:
@@ -67,6 +157,79 @@ def n_visible(grid: List[List[int]], visible_grid: List[List[int]]) -> int:
     return count
 
 
+def visibility(
+    grid: Sequence[Sequence[int]],
+) -> Union[List[List[bool]], np.ndarray]:
+    """
+    Return which cells are visible from outside the grid, in O(W x H): a bool
+    ndarray if NumPy is available, else a list of lists.
+
+    A tree is visible from a direction iff it's taller than the running maximum
+    of the trees before it, so one sweep per direction finds them all.
+    """
+    if np is not None:
+        return visibility_np(np.asarray(grid))
+
+    width = len(grid[0])
+    height = len(grid)
+
+    visible = [[False] * width for _ in range(height)]
+
+    # Fetch each row once; rows of a ByteGrid are views made on demand
+    rows = [grid[row] for row in range(height)]
+
+    def sweeps() -> Iterator[Iterator[Tuple[int, int]]]:
+        for row in range(height):
+            yield ((row, col) for col in range(width))  # from the left
+            yield ((row, col) for col in range(width - 1, -1, -1))  # right
+        for col in range(width):
+            yield ((row, col) for row in range(height))  # from the top
+            yield ((row, col) for row in range(height - 1, -1, -1))  # bottom
+
+    for sweep in sweeps():
+        tallest = -1
+        for row, col in sweep:
+            tree_height = rows[row][col]
+            if tree_height > tallest:
+                visible[row][col] = True
+                tallest = tree_height
+                if tallest == MAX_HEIGHT:
+                    break
+
+    return visible
+
+
+def visibility_np(grid: np.ndarray) -> np.ndarray:
+    """
+    As visibility, with each sweep a vectorized maximum.accumulate.
+    """
+    grid = grid.astype(np.int16)
+    visible = np.zeros(grid.shape, dtype=bool)
+
+    for k in range(4):
+        # Rotate so each direction becomes a sweep from the left
+        rotated = np.rot90(grid, k)
+        tallest = np.maximum.accumulate(rotated, axis=1)
+
+        # The tallest tree strictly before each cell; -1 at the edge
+        before = np.full(rotated.shape, -1, dtype=np.int16)
+        before[:, 1:] = tallest[:, :-1]
+
+        visible |= np.rot90(rotated > before, -k)
+
+    return visible
+
+
+def n_visible_sweep(grid: Sequence[Sequence[int]]) -> int:
+    """
+    As n_visible, in O(W x H).
+    """
+    visible = visibility(grid)
+    if np is not None:
+        return int(visible.sum())
+    return sum(sum(row) for row in visible)
+
+
 def get_score(row: int, col: int, grid: List[List[int]]) -> bool:
     """
     Return whether the cell is visible
@@ -124,25 +287,326 @@ def max_score(grid: List[List[int]]) -> int:
     return max_score
 
 
-def partX() -> None:
-    with open("input.txt") as f:
-        lines = f.readlines()
+def view_distances(line: Sequence[int]) -> List[int]:
+    """
+    For each tree in line, return how many trees it can see looking back towards
+    the start of line, in O(len(line)).
+
+    Keep a stack of the trees that could still block a later one, shortest on
+    top; a tree pops everything shorter than it, and then sees up to whatever is
+    left on top (or the edge).
+    """
+    distances = []
+    stack: List[int] = []
+    for i, tree_height in enumerate(line):
+        while stack and line[stack[-1]] < tree_height:
+            stack.pop()
+        distances.append(i - stack[-1] if stack else i)
+        stack.append(i)
+    return distances
+
+
+def scenic_scores(grid: Sequence[Sequence[int]]) -> List[List[int]]:
+    """
+    Return the scenic score of every cell, in O(W x H).
+    """
+    width = len(grid[0])
+    height = len(grid)
+
+    scores = [[1] * width for _ in range(height)]
+
+    for row in range(height):
+        line = list(grid[row])
+        left = view_distances(line)
+        right = view_distances(line[::-1])[::-1]
+        for col in range(width):
+            scores[row][col] *= left[col] * right[col]
+
+    for col in range(width):
+        line = [grid[row][col] for row in range(height)]
+        up = view_distances(line)
+        down = view_distances(line[::-1])[::-1]
+        for row in range(height):
+            scores[row][col] *= up[row] * down[row]
+
+    return scores
+
+
+def max_score_stack(grid: Sequence[Sequence[int]]) -> int:
+    """
+    As max_score, in O(W x H).
+    """
+    return max(max(row) for row in scenic_scores(grid))
+
+
+### Tiled mode, for forests that don't fit in memory!
+
+# The grid is cut into bands of whole rows, and solved in two passes over a pool:
+#
+#   1. each band summarizes its columns: the tallest tree, and for each height h,
+#      the first and last row holding a tree at least h tall
+#   2. the summaries are combined into what each band would "see" above and
+#      below it, and each band is solved with those as its boundaries
+#
+# Rows are whole within a band, so left / right never need a boundary. Band
+# sizes come from a memory budget, and the per-band summaries / boundaries are
+# kept in temporary files, so memory doesn't grow with the number of bands.
+
+# Column summaries hold one entry per (column, height): index col * N_HEIGHTS + h
+N_HEIGHTS = MAX_HEIGHT + 1
+
+# Bytes of band data band_solve holds per cell: the height, and its view up
+BAND_BYTES_PER_CELL = 5
+
+# How many bytes of band data each worker may hold, by default
+MEMORY_BUDGET = 1 << 26
+
+# In band_solve's up array, the viewing distance up, and whether the tree is
+# visible from above
+VISIBLE_BIT = 1 << 31
+DISTANCE_MASK = VISIBLE_BIT - 1
+
+
+def read_band(path: str, top: int, bottom: int) -> Tuple[List[bytes], int, int]:
+    """
+    Return the heights of rows [top, bottom) of a memory-mapped grid, and the
+    grid's width and height. Only the band is ever copied out of the map.
+    """
+    grid = load_grid(path, use_mmap=True)
+    rows = [bytes(grid[row]).translate(DIGITS) for row in range(top, bottom)]
+    width, height = grid.width, grid.height
+    grid.data.close()
+    return rows, width, height
+
+
+def band_summary(path: str, top: int, bottom: int) -> Tuple[List[int], ...]:
+    """
+    Pass 1: return the band's per-column max, and per (column, height), the first
+    and last row with a tree at least that tall (-1 if none).
+    """
+    rows, width, _ = read_band(path, top, bottom)
+
+    tallest = [-1] * width
+    first = [-1] * (width * N_HEIGHTS)
+    last = [-1] * (width * N_HEIGHTS)
+
+    for row, line in enumerate(rows, top):
+        for col, tree_height in enumerate(line):
+            if tree_height > tallest[col]:
+                tallest[col] = tree_height
+            base = col * N_HEIGHTS
+            for h in range(base, base + tree_height + 1):
+                if first[h] == -1:
+                    first[h] = row
+                last[h] = row
+
+    return tallest, first, last
+
+
+def band_solve(
+    path: str,
+    top: int,
+    bottom: int,
+    above_max: Sequence[int],
+    below_max: Sequence[int],
+    above_last: Sequence[int],
+    below_first: Sequence[int],
+) -> Tuple[int, int]:
+    """
+    Pass 2: return the number of visible trees and the max scenic score in the
+    band, given the tallest tree above / below it per column, and the nearest
+    row above / below it with a tree at least h tall per (column, h).
+
+    Sweep down the band once, keeping only each cell's view up (4 bytes); then
+    sweep back up it, finishing every cell as it's reached and keeping just a
+    running count and max.
+    """
+    rows, width, height = read_band(path, top, bottom)
+
+    up = array("I", [0]) * (len(rows) * width)
+
+    tallest = list(above_max)
+    nearest = list(above_last)
+    for i, line in enumerate(rows):
+        row = top + i
+        for col, tree_height in enumerate(line):
+            view = 0
+            if tree_height > tallest[col]:
+                view = VISIBLE_BIT
+                tallest[col] = tree_height
+
+            base = col * N_HEIGHTS
+            blocker = nearest[base + tree_height]
+            view |= row - blocker if blocker != -1 else row
+            up[i * width + col] = view
+
+            for h in range(base, base + tree_height + 1):
+                nearest[h] = row
+
+    count = 0
+    best = 0
+
+    tallest = list(below_max)
+    nearest = list(below_first)
+    for i in range(len(rows) - 1, -1, -1):
+        row = top + i
+        line = rows[i]
+
+        seen = bytearray(width)
+        for cols in (range(width), range(width - 1, -1, -1)):
+            tallest_in_row = -1
+            for col in cols:
+                if line[col] > tallest_in_row:
+                    seen[col] = 1
+                    tallest_in_row = line[col]
+
+        left = view_distances(line)
+        right = view_distances(line[::-1])[::-1]
+
+        for col, tree_height in enumerate(line):
+            view = up[i * width + col]
+
+            visible = seen[col] or view & VISIBLE_BIT
+            if tree_height > tallest[col]:
+                visible = True
+                tallest[col] = tree_height
+
+            base = col * N_HEIGHTS
+            blocker = nearest[base + tree_height]
+            down = blocker - row if blocker != -1 else height - 1 - row
+            for h in range(base, base + tree_height + 1):
+                nearest[h] = row
+
+            count += 1 if visible else 0
+            score = (view & DISTANCE_MASK) * down * left[col] * right[col]
+            if score > best:
+                best = score
+
+    return count, best
+
+
+def bounded_map(
+    pool: Executor, fn: Callable[..., Any], tasks: Iterable[tuple], window: int
+) -> Iterator[Any]:
+    """
+    As pool.map(fn, *zip(*tasks)), in order, but with at most window tasks in
+    flight; tasks is only consumed as results are taken.
+    """
+    pending: deque = deque()
+    for task in tasks:
+        pending.append(pool.submit(fn, *task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def write_record(f: BinaryIO, k: int, values: Iterable[int], length: int) -> None:
+    """
+    Write the kth fixed-length record of int64s to f.
+    """
+    f.seek(k * length * 8)
+    array("q", values).tofile(f)
+
+
+def read_record(f: BinaryIO, k: int, length: int) -> array:
+    """
+    Read back the kth record written by write_record.
+    """
+    f.seek(k * length * 8)
+    record = array("q")
+    record.fromfile(f, length)
+    return record
 
-        W = len(lines[0].strip())
-        H = len(lines)
 
-        grid = build_grid(W, H)
+def split_record(record: array, *lengths: int) -> List[array]:
+    """
+    Cut a record into consecutive fields of the given lengths.
+    """
+    fields, start = [], 0
+    for length in lengths:
+        fields.append(record[start : start + length])
+        start += length
+    return fields
+
+
+def tiled(
+    path: str,
+    memory_budget: int = MEMORY_BUDGET,
+    workers: Optional[int] = None,
+    band_rows: Optional[int] = None,
+) -> Tuple[int, int]:
+    """
+    Return (n_visible, max_score) of the grid at path, solved band by band in a
+    process pool; the answers are identical to the in-memory engines.
+
+    Bands are as tall as fits memory_budget bytes of band data (or band_rows, if
+    given), so each worker's memory is bounded however big the grid is.
+    """
+    grid = load_grid(path, use_mmap=True)
+    width, height = grid.width, grid.height
+    grid.data.close()
+
+    if band_rows is None:
+        band_rows = max(1, memory_budget // (max(width, 1) * BAND_BYTES_PER_CELL))
+    bands = [(top, min(top + band_rows, height)) for top in range(0, height, band_rows)]
+
+    window = 2 * (workers or os.cpu_count() or 1)
+
+    # Records: a band's (tallest, first, last) summary, and what's below it
+    summary_length = width * (1 + 2 * N_HEIGHTS)
+    below_length = width * (1 + N_HEIGHTS)
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    summaries, below = tempfile.TemporaryFile(), tempfile.TemporaryFile()
+    with pool, summaries, below:
+        summary_tasks = ((path, top, bottom) for top, bottom in bands)
+        for k, (tallest, first, last) in enumerate(
+            bounded_map(pool, band_summary, summary_tasks, window)
+        ):
+            write_record(summaries, k, tallest + first + last, summary_length)
+
+        # What each band sees below it: a running combination, bottom-up
+        tallest, first = [-1] * width, [-1] * (width * N_HEIGHTS)
+        for k in range(len(bands) - 1, -1, -1):
+            write_record(below, k, tallest + first, below_length)
+
+            summary = read_record(summaries, k, summary_length)
+            band_max, band_first = split_record(summary, width, width * N_HEIGHTS)
+            tallest = [max(a, b) for a, b in zip(tallest, band_max)]
+            first = [b if b != -1 else a for a, b in zip(first, band_first)]
+
+        def solve_tasks() -> Iterator[tuple]:
+            # ...and above it, top-down, as the bands are handed out
+            tallest, last = [-1] * width, [-1] * (width * N_HEIGHTS)
+            for k, (top, bottom) in enumerate(bands):
+                below_max, below_first = split_record(
+                    read_record(below, k, below_length), width, width * N_HEIGHTS
+                )
+                yield (path, top, bottom, tallest, below_max, last, below_first)
+
+                summary = read_record(summaries, k, summary_length)
+                band_max, _, band_last = split_record(
+                    summary, width, width * N_HEIGHTS, width * N_HEIGHTS
+                )
+                tallest = [max(a, b) for a, b in zip(tallest, band_max)]
+                last = [b if b != -1 else a for a, b in zip(last, band_last)]
+
+        count, best = 0, 0
+        for band_count, band_best in bounded_map(
+            pool, band_solve, solve_tasks(), window
+        ):
+            count += band_count
+            best = max(best, band_best)
+
+    return count, best
 
-        # TODO(michaelfromyeg: use this structure; memoize the visible values
-        visible_grid = build_grid(W, H)
 
-        for row, line in enumerate(lines):
-            line = line.strip()
-            for column, char in enumerate(line):
-                grid[row][column] = int(char)
+def partX() -> None:
+    grid = load_grid("input.txt")
 
-        print(n_visible(grid=grid, visible_grid=visible_grid))
-        print(max_score(grid=grid))
+    print(n_visible_sweep(grid=grid))
+    print(max_score_stack(grid=grid))
 
 
 if __name__ == "__main__":
@@ -1,10 +1,11 @@
 from __future__ import annotations
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
 from enum import Enum
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Sequence, Set, TextIO, Tuple
 
-# It would be nice if the problem specified a needed grid size... pick huge values to accomodate
-# TODO(michaelfromyeg): could the rope wrap around instead?
+# The rope itself is unbounded (visited cells are kept in a set); a grid is only
+# built to draw it while debugging, which needs a size
 GRID_WIDTH = 1000
 GRID_HEIGHT = 1000
 
@@ -92,7 +93,7 @@ def str2direction(s: str) -> Direction:
 
 def build_grid(value: any) -> List[List[any]]:
     """
-    Initialize the grid.
+    Initialize the grid, for the draw_grid debugging helpers.
     """
     grid: List[List[any]] = []
     for _ in range(GRID_HEIGHT):
@@ -106,7 +107,7 @@ def build_grid(value: any) -> List[List[any]]:
 
 def move_point(direction: Direction, point: Point) -> Point:
     """
-    Move point in direction. For now, assume input is always valid, i.e., never exceeds grid size.
+    Move point in direction.
     """
     match direction:
         case Direction.D:
@@ -159,13 +160,10 @@ def process_move(
     direction: Direction,
     head_position: Point,
     tail_position: Point,
-    grid: List[List[str]],
-    t_visited_grid: List[List[bool]],
-) -> None:
+    t_visited: Set[Tuple[int, int]],
+) -> Tuple[Point, Point]:
     """
-    Process a move from the grid, updating t_visited_grid if need be.
-
-    TODO: actually use grid, if need be. Just tracking points should be OK.
+    Process a move, adding the tail's new position to t_visited.
     """
     next_head_position = move_point(direction, head_position)
     next_tail_position = tail_position
@@ -182,8 +180,7 @@ def process_move(
             opposite_direction(direction), next_head_position
         )
 
-    t_visited_grid[next_tail_position.y][next_tail_position.x] = True
-    # draw_grid(grid, next_head_position, next_tail_position)
+    t_visited.add((next_tail_position.x, next_tail_position.y))
 
     return next_head_position, next_tail_position
 
@@ -191,11 +188,10 @@ def process_move(
 def process_move2(
     direction: Direction,
     points: List[Point],
-    grid: List[List[str]],
-    t_visited_grid: List[List[bool]],
-) -> None:
+    t_visited: Set[Tuple[int, int]],
+) -> List[Point]:
     """
-    Process a move from the grid, updating t_visited_grid if need be.
+    Process a move, adding the tail's new position to t_visited.
 
     Must now process n points, where the first element is the tail, and the last element is the head.
     """
@@ -254,7 +250,7 @@ def process_move2(
 
         # # If mock_tail was the actual tail...
         if point_idx == 0:
-            t_visited_grid[next_mock_tail.y][next_mock_tail.x] = True
+            t_visited.add((next_mock_tail.x, next_mock_tail.y))
 
         points[point_idx + 1] = next_head
         points[point_idx] = next_mock_tail
@@ -267,100 +263,281 @@ def process_move2(
     return points
 
 
-def part1() -> None:
-    with open("input.txt") as f:
-        lines = f.readlines()
+# The head's unit step in each direction; y grows downwards, as in move_point
+STEPS: Dict[Direction, Tuple[int, int]] = {
+    Direction.U: (0, -1),
+    Direction.D: (0, 1),
+    Direction.L: (-1, 0),
+    Direction.R: (1, 0),
+}
 
-        moves: List[Move] = []
-        for line in lines:
-            line = line.strip()
-            d, n = line.split(" ")
 
-            move = Move(d=str2direction(d), n=int(n))
-            moves.append(move)
+def iter_moves(f: TextIO) -> Iterator[Move]:
+    """
+    Lazily parse the input into moves.
+    """
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        d, n = line.split(" ")
 
-        grid = build_grid(".")
-        t_visited_grid = build_grid(False)
+        yield Move(d=str2direction(d), n=int(n))
 
-        # Set the initial head_position to the (middle); tail starts overlapping
-        head_position = Point(x=GRID_WIDTH // 2, y=GRID_HEIGHT // 2)
-        tail_position = Point(x=GRID_WIDTH // 2, y=GRID_HEIGHT // 2)
 
-        # Set the initial position for the head; tail has visited it by default!
-        t_visited_grid[head_position.y][head_position.x] = True
+def parse(f: TextIO) -> List[Move]:
+    """
+    Parse the input into a list of moves.
+    """
+    return list(iter_moves(f))
 
-        # draw_grid(grid, head_position, tail_position)
 
-        # Process moves through the grid, updating head_position, tail_position throughout
-        for move in moves:
-            n = move.n
-            while n > 0:
-                head_position, tail_position = process_move(
-                    move.d, head_position, tail_position, grid, t_visited_grid
-                )
-                n = n - 1
+def sign(n: int) -> int:
+    return (n > 0) - (n < 0)
 
-        total = 0
-        for row in t_visited_grid:
-            total += sum(row)
 
-        # The answer!
-        print(total)
+def merge(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    Merge closed integer intervals into disjoint, sorted ones.
+    """
+    merged: List[Tuple[int, int]] = []
+    for lo, hi in sorted(intervals):
+        if merged and lo <= merged[-1][1] + 1:
+            if hi > merged[-1][1]:
+                merged[-1] = (merged[-1][0], hi)
+        else:
+            merged.append((lo, hi))
+    return merged
 
 
-def part2() -> None:
-    with open("input.txt") as f:
-        lines = f.readlines()
+class Trail:
+    """
+    The cells a knot has visited: single cells in a set, and straight runs as
+    intervals per row / column, so adding a run of any length is O(1).
+    """
 
-        moves: List[Move] = []
-        for line in lines:
-            line = line.strip()
-            d, n = line.split(" ")
+    def __init__(self) -> None:
+        self.cells: Set[Tuple[int, int]] = set()
+        # y -> [(x1, x2)], for runs along a row
+        self.rows: Dict[int, List[Tuple[int, int]]] = {}
+        # x -> [(y1, y2)], for runs along a column
+        self.cols: Dict[int, List[Tuple[int, int]]] = {}
 
-            move = Move(d=str2direction(d), n=int(n))
-            moves.append(move)
+    def add(self, x: int, y: int) -> None:
+        self.cells.add((x, y))
 
-        grid = build_grid(".")
-        t_visited_grid = build_grid(False)
+    def add_run(self, x: int, y: int, dx: int, dy: int, n: int) -> None:
+        """
+        Add the n cells a knot at (x, y) passes through stepping n times by
+        (dx, dy), a unit step along one axis.
+        """
+        if dx:
+            end = x + dx * n
+            self.rows.setdefault(y, []).append((min(x + dx, end), max(x + dx, end)))
+        else:
+            end = y + dy * n
+            self.cols.setdefault(x, []).append((min(y + dy, end), max(y + dy, end)))
 
-        # Set the initial head_position to the (middle); tail starts overlapping
-        n_points = 10
-        points: List[Point] = []
-        for _ in range(n_points):
-            points.append(Point(x=GRID_WIDTH // 2, y=GRID_HEIGHT // 2))
+    def __len__(self) -> int:
+        """
+        Count the distinct cells: everything along rows (single cells included),
+        plus everything along columns, minus the cells counted by both.
+        """
+        rows = {y: list(runs) for y, runs in self.rows.items()}
+        for x, y in self.cells:
+            rows.setdefault(y, []).append((x, x))
+
+        horizontal = [(y, lo, hi) for y, runs in rows.items() for lo, hi in merge(runs)]
+        vertical = [
+            (x, lo, hi) for x, runs in self.cols.items() for lo, hi in merge(runs)
+        ]
+
+        total = sum(hi - lo + 1 for _, lo, hi in horizontal)
+        total += sum(hi - lo + 1 for _, lo, hi in vertical)
+
+        # Sweep down the rows: a column run is active from its first row to its
+        # last; each row run overlaps the active column runs within its x range.
+        # Column runs of the same column are disjoint, so at most one is active.
+        xs = sorted(self.cols)
+        events = []
+        for x, lo, hi in vertical:
+            events.append((lo, 0, x, 1))
+            events.append((hi + 1, 0, x, -1))
+        for y, lo, hi in horizontal:
+            events.append((y, 1, lo, hi))
+        events.sort()
+
+        # Fenwick tree over the active column runs, by column
+        tree = [0] * (len(xs) + 1)
+
+        def prefix(i: int) -> int:
+            count = 0
+            while i > 0:
+                count += tree[i]
+                i -= i & -i
+            return count
+
+        for _, kind, a, b in events:
+            if kind == 0:
+                i = bisect_left(xs, a) + 1
+                while i < len(tree):
+                    tree[i] += b
+                    i += i & -i
+            else:
+                total -= prefix(bisect_right(xs, b)) - prefix(bisect_left(xs, a))
 
-        # Set the initial position for the head; tail has visited it by default!
-        head_position = points[n_points - 1]
-        t_visited_grid[head_position.y][head_position.x] = True
+        return total
 
-        # print(points)
-        # draw_grid2(grid, points)
 
-        directions: List[Direction] = []
-        for move in moves:
-            for _ in range(move.n):
-                directions.append(move.d)
-
-        # Process moves through the grid, updating head_position, tail_position throughout
-        for i, direction in enumerate(directions):
-            points = process_move2(
-                direction=direction,
-                points=points,
-                grid=grid,
-                t_visited_grid=t_visited_grid,
+def simulate(moves: Iterable[Move], n_knots: int, fast: bool = True) -> int:
+    """
+    Pull a rope of n_knots through moves and return the number of cells its tail
+    visits; see simulate_many.
+    """
+    return simulate_many(moves, [n_knots], fast)[n_knots]
+
+
+def simulate_many(
+    moves: Iterable[Move], lengths: Sequence[int], fast: bool = True
+) -> Dict[int, int]:
+    """
+    Pull ropes of each of the given lengths through moves, one step at a time,
+    and return the number of cells each one's tail visits, by length.
+
+    A knot only ever follows the knots before it, so a rope of n knots moves
+    exactly like the first n knots of any longer rope: one rope of the longest
+    length is simulated, and the tail of each shorter rope is read off of it.
+
+    Unlike process_move2, knot 0 is the head. Knots are plain ints updated in
+    place: a knot that's no longer adjacent to the one before it steps by the sign
+    of the gap in each axis (which covers straight and diagonal pulls alike), and
+    once a knot doesn't move, none after it will either.
+
+    If fast, as soon as a step moves every knot exactly as it moved the head, the
+    rope is taut: the rest of the move just slides it along, so that's applied
+    in one go, with each tail's path added as a run. The cost is then (roughly)
+    per move, not per step.
+    """
+    n_knots = max(lengths)
+    xs = [0] * n_knots
+    ys = [0] * n_knots
+
+    # The knot that is each rope's tail, in order along the rope
+    tails = sorted({length - 1 for length in lengths})
+
+    # Every tail has visited its starting position by default!
+    t_visited: Dict[int, Trail] = {tail: Trail() for tail in tails}
+    for trail in t_visited.values():
+        trail.add(0, 0)
+
+    for move in moves:
+        dx, dy = STEPS[move.d]
+        for step in range(move.n):
+            xs[0] += dx
+            ys[0] += dy
+
+            # The number of knots that moved this step
+            moved = n_knots
+            taut = True
+            for i in range(1, n_knots):
+                gap_x = xs[i - 1] - xs[i]
+                gap_y = ys[i - 1] - ys[i]
+                if -1 <= gap_x <= 1 and -1 <= gap_y <= 1:
+                    moved = i
+                    taut = False
+                    break
+                step_x, step_y = sign(gap_x), sign(gap_y)
+                xs[i] += step_x
+                ys[i] += step_y
+                taut = taut and step_x == dx and step_y == dy
+
+            for tail in tails:
+                if tail >= moved:
+                    break
+                t_visited[tail].add(xs[tail], ys[tail])
+
+            remaining = move.n - step - 1
+            if fast and taut and remaining > 0:
+                for tail in tails:
+                    t_visited[tail].add_run(xs[tail], ys[tail], dx, dy, remaining)
+                for i in range(n_knots):
+                    xs[i] += dx * remaining
+                    ys[i] += dy * remaining
+                break
+
+    return {length: len(t_visited[length - 1]) for length in lengths}
+
+
+def part1_reference(moves: List[Move]) -> int:
+    """
+    part1 with Points and process_move; kept to check simulate against.
+    """
+    t_visited: Set[Tuple[int, int]] = set()
+
+    # Head and tail start overlapping, at the origin
+    head_position = Point(x=0, y=0)
+    tail_position = Point(x=0, y=0)
+
+    # The tail has visited its starting position by default!
+    t_visited.add((tail_position.x, tail_position.y))
+
+    # Process moves, updating head_position, tail_position throughout
+    for move in moves:
+        n = move.n
+        while n > 0:
+            head_position, tail_position = process_move(
+                move.d, head_position, tail_position, t_visited
             )
+            n = n - 1
 
-            # if i == 25:
-            #     draw_grid2(grid, points)
+    # The answer!
+    return len(t_visited)
 
-        total = 0
-        for row in t_visited_grid:
-            total += sum(row)
 
-        # The answer!
-        print(total)
+def part2_reference(moves: List[Move]) -> int:
+    """
+    part2 with Points and process_move2; kept to check simulate against.
+    """
+    t_visited: Set[Tuple[int, int]] = set()
+
+    # All knots start overlapping, at the origin
+    n_points = 10
+    points: List[Point] = []
+    for _ in range(n_points):
+        points.append(Point(x=0, y=0))
+
+    # The tail has visited its starting position by default!
+    t_visited.add((points[0].x, points[0].y))
+
+    directions: List[Direction] = []
+    for move in moves:
+        for _ in range(move.n):
+            directions.append(move.d)
+
+    # Process moves, updating every knot throughout
+    for direction in directions:
+        points = process_move2(
+            direction=direction,
+            points=points,
+            t_visited=t_visited,
+        )
+
+    # The answer!
+    return len(t_visited)
+
+
+def part1(moves: Iterable[Move]) -> int:
+    return simulate(moves, n_knots=2)
+
+
+def part2(moves: Iterable[Move]) -> int:
+    return simulate(moves, n_knots=10)
 
 
 if __name__ == "__main__":
-    part1()
-    part2()
+    with open("input.txt") as f:
+        # Both parts in one pass over the moves
+        visited = simulate_many(iter_moves(f), [2, 10])
+
+    print(visited[2])
+    print(visited[10])
@@ -0,0 +1,89 @@
+"""
+Run a day's solution, parsing its input once and sharing it between both parts.
+
+Usage (from the repository root):
+
+    python scripts/run.py 1 2 3
+    python scripts/run.py 9 --input input-test.txt
+
+Each day module must expose `parse(f)`, `part1(data)` and `part2(data)`.
+
+`parse` is handed the open file, so days that stream their input (e.g. day1)
+keep their fixed memory use here too. The "open" phase is just opening the
+file; reading it happens as it's parsed, so all of the I/O is part of "parse".
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+from types import ModuleType
+from typing import Any, Callable, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The days that follow the parse / part1 / part2 layout
+DAYS = [1, 2, 3, 4, 5, 9, 11]
+
+
+def load_day(day: int) -> ModuleType:
+    """
+    Import dayN/dayN.py by path; the day folders aren't packages.
+    """
+    path = os.path.join(ROOT, f"day{day}", f"day{day}.py")
+    spec = importlib.util.spec_from_file_location(f"day{day}", path)
+    module = importlib.util.module_from_spec(spec)
+    # dataclasses look the module up by name while resolving annotations
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def timed(fn: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+    """
+    Call fn, returning its result and the elapsed time in milliseconds.
+    """
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run_day(day: int, input_name: str) -> List[Tuple[str, Any, float]]:
+    """
+    Read, parse and solve a single day; return (phase, result, ms) rows.
+    """
+    module = load_day(day)
+    path = os.path.join(ROOT, f"day{day}", input_name)
+
+    f, open_ms = timed(open, path)
+    with f:
+        data, parse_ms = timed(module.parse, f)
+    part1, part1_ms = timed(module.part1, data)
+    part2, part2_ms = timed(module.part2, data)
+
+    return [
+        ("open", None, open_ms),
+        ("parse", None, parse_ms),
+        ("part1", part1, part1_ms),
+        ("part2", part2, part2_ms),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("days", nargs="*", type=int, default=DAYS)
+    parser.add_argument("--input", default="input.txt", help="file in each dayN/")
+    args = parser.parse_args()
+
+    for day in args.days:
+        if day not in DAYS:
+            raise ValueError(f"Day {day} does not support the shared runner")
+
+        print(f"day{day}")
+        for phase, result, ms in run_day(day, args.input):
+            answer = "" if result is None else f" {result}"
+            print(f"  {phase:<5} {ms:10.3f} ms{answer}")
+
+
+if __name__ == "__main__":
+    main()